@@ -1,19 +1,21 @@
 """Slovak TV Program Integration for Home Assistant."""
 import logging
-from datetime import timedelta
+from typing import List
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.start import async_at_started
 
-from .const import DOMAIN, PLATFORMS
+from .const import DOMAIN, PLATFORMS, CONF_FEED_URL, XMLTV_API_URL
 from .api import SkTVProgramAPI
+from .coordinator import SkTVProgramCoordinator
+from .storage import get_program_store
+from .string_pool import get_string_pool
+from .watch import WatchScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(hours=6)
-
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Slovak TV Program component."""
@@ -26,34 +28,40 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     try:
-        channels = entry.data.get("channels", [])
+        channels = entry.options.get("channels", entry.data.get("channels", []))
+        feed_url = entry.options.get(CONF_FEED_URL, entry.data.get(CONF_FEED_URL, XMLTV_API_URL))
+
+        # Watch list for favourite programmes, compiled once per entry
+        watch_scheduler = WatchScheduler.from_config(hass, entry.options)
+        await watch_scheduler.async_load()
+        entry.async_on_unload(watch_scheduler.async_cancel_all)
+
+        # Last good programs for stale-while-revalidate
+        snapshot, fetched_at = await get_program_store(hass).async_load()
 
         # Create a coordinator for each channel
         coordinators = {}
+        revalidate = []
 
         for channel_id in channels:
             api = SkTVProgramAPI(
                 hass=hass,
-                channels=[channel_id]  # Only this channel
+                channels=[channel_id],  # Only this channel
+                feed_url=feed_url,
+                string_pool=get_string_pool(hass),
             )
 
-            async def async_update_data(channel=channel_id, api_instance=api):
-                """Fetch data with error handling for a specific channel."""
-                try:
-                    data = await api_instance.async_update_channel_data(channel)
-                    if not data:
-                        _LOGGER.warning("No data received from API for channel %s", channel)
-                    return data
-                except Exception as err:
-                    raise UpdateFailed(f"Error fetching data for {channel}: {err}") from err
-
-            coordinator = DataUpdateCoordinator(
-                hass,
-                _LOGGER,
-                name=f"{DOMAIN}_{channel_id}",
-                update_method=async_update_data,
-                update_interval=SCAN_INTERVAL,
-            )
+            coordinator = SkTVProgramCoordinator(hass, api, channel_id, watch_scheduler)
+
+            # Uložený program servírovat hned, ověření proběhne na pozadí
+            if coordinator.async_seed(snapshot.get(channel_id), fetched_at.get(channel_id)):
+                _LOGGER.debug("Serving cached programs for %s until revalidated", channel_id)
+                revalidate.append(coordinator)
+                coordinators[channel_id] = {
+                    "coordinator": coordinator,
+                    "api": api,
+                }
+                continue
 
             # První refresh s timeout protection
             try:
@@ -73,8 +81,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         hass.data[DOMAIN][entry.entry_id] = coordinators
 
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+        if revalidate:
+            # Ověření až po startu, aby nezdržovalo dokončení startu HA
+            @callback
+            def _async_start_revalidation(_hass: HomeAssistant) -> None:
+                revalidate_task = hass.async_create_task(_async_revalidate(revalidate))
+                entry.async_on_unload(revalidate_task.cancel)
+
+            entry.async_on_unload(async_at_started(hass, _async_start_revalidation))
+
         _LOGGER.info("Slovak TV Program integration loaded successfully with %d channels", len(coordinators))
         return True
 
@@ -85,6 +104,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+async def _async_revalidate(coordinators: List[SkTVProgramCoordinator]) -> None:
+    """Refresh coordinators seeded from the snapshot one after another."""
+    # Označit celou frontu, aby senzory počkaly na zbytek cyklu
+    for coordinator in coordinators:
+        coordinator.refreshing = True
+    try:
+        for coordinator in coordinators:
+            await coordinator.async_refresh()
+    finally:
+        for coordinator in coordinators:
+            coordinator.refreshing = False
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     try:
@@ -103,5 +135,4 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
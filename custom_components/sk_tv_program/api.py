@@ -1,8 +1,11 @@
 """API client for Slovak TV Program from open-epg.com."""
 import logging
 import asyncio
+import os
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from defusedxml import ElementTree as ET
 from xml.etree.ElementTree import Element
 
@@ -11,30 +14,100 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util import dt as dt_util
 
 from .const import XMLTV_API_URL, API_TIMEOUT, AVAILABLE_CHANNELS, DEFAULT_DAYS_AHEAD
+from .string_pool import StringPool
 
 _LOGGER = logging.getLogger(__name__)
 
 # Maximální počet programů na kanál pro zabránění memory problémům
 MAX_PROGRAMS_PER_CHANNEL = 500
 
+
+def _programme_fingerprint(programme: Element, stop_str: str, intern: Callable[[str], str]) -> Tuple:
+    """Return a cheap identity of a programme element's content."""
+    return (stop_str,) + tuple(
+        (
+            child.tag,
+            intern(child.text) if child.text else child.text,
+            tuple(child.attrib.items()),
+            tuple((grandchild.tag, grandchild.text) for grandchild in child),
+        )
+        for child in programme
+    )
+
+
+def _parse_xmltv_ns(value: str) -> Tuple[Optional[int], Optional[int]]:
+    """Parse an xmltv_ns episode number (zero based "season.episode.part")."""
+    parts = value.replace(" ", "").split(".")
+    numbers: List[Optional[int]] = []
+    for part in parts[:2]:
+        # "2/10" means index 2 of 10
+        index = part.split("/")[0]
+        numbers.append(int(index) + 1 if index.isdigit() else None)
+    while len(numbers) < 2:
+        numbers.append(None)
+    return numbers[0], numbers[1]
+
+
+def _local_feed_path(url: str) -> Optional[str]:
+    """Return the local file path for file:// URLs and plain paths, else None."""
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    if not parsed.scheme:
+        return url
+    return None
+
+
+def is_valid_feed_url(url: str) -> bool:
+    """Return True for http(s) and file:// URLs and paths to existing files.
+
+    Note: Checks the file system, call it in executor.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return False
+    if urlparse(url).scheme in ("http", "https"):
+        return bool(urlparse(url).netloc)
+    path = _local_feed_path(url)
+    return path is not None and os.path.isfile(path)
+
+
+def _read_feed_file(path: str) -> bytes:
+    """Read a local XMLTV file as bytes so the parser honours its declared encoding."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
 class SkTVProgramAPI:
     """API client for Slovak TV Program."""
 
-    def __init__(self, hass: HomeAssistant, channels: List[str]):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        channels: List[str],
+        feed_url: str = XMLTV_API_URL,
+        string_pool: Optional[StringPool] = None,
+    ):
         """Initialize the API client."""
         self.hass = hass
         self.channels = channels or list(AVAILABLE_CHANNELS.keys())
+        self.feed_url = feed_url or XMLTV_API_URL
         self.session = async_get_clientsession(hass)
+        # channel_id -> {(xmltv channel, start): (fingerprint, program)}
+        self._program_cache: Dict[str, Dict[Tuple[str, str], Tuple[Tuple, Dict[str, Any]]]] = {}
+        # Reruns, episodes and simulcasts repeat the same titles, genres and
+        # descriptions; the pool keeps one copy shared by all channels
+        self._string_pool = string_pool if string_pool is not None else StringPool()
+        self._used_strings: Set[str] = set()
 
     async def async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from open-epg.com XMLTV feed and return structured program info."""
+        """Fetch data from the XMLTV feed and return structured program info."""
         all_data: Dict[str, List[Dict[str, Any]]] = {}
         try:
-            # Fetch open-epg.com feed
-            xmltv_root = await self._fetch_xmltv(XMLTV_API_URL)
+            # Fetch the configured XMLTV feed
+            xmltv_root = await self._fetch_xmltv(self.feed_url)
 
             if xmltv_root is None:
-                _LOGGER.warning("No XMLTV data available from open-epg.com")
+                _LOGGER.warning("No XMLTV data available from %s", self.feed_url)
                 return all_data
 
             # Parsování v executor aby neblokoval event loop
@@ -77,13 +150,15 @@ class SkTVProgramAPI:
             return all_data
 
     async def async_update_channel_data(self, channel_id: str) -> List[Dict[str, Any]]:
-        """Fetch data for a single channel from open-epg.com XMLTV feed."""
+        """Fetch data for a single channel from the XMLTV feed."""
         try:
-            # Fetch open-epg.com feed
-            xmltv_root = await self._fetch_xmltv(XMLTV_API_URL)
+            # Fetch the configured XMLTV feed
+            xmltv_root = await self._fetch_xmltv(self.feed_url)
 
             if xmltv_root is None:
-                _LOGGER.warning("No XMLTV data available from open-epg.com for channel %s", channel_id)
+                _LOGGER.warning(
+                    "No XMLTV data available from %s for channel %s", self.feed_url, channel_id
+                )
                 return []
 
             # Použít executor pro CPU-intensive operace
@@ -116,28 +191,21 @@ class SkTVProgramAPI:
             return []
 
     async def _fetch_xmltv(self, url: str) -> Optional[Element]:
-        """Fetch XMLTV data from a given URL."""
+        """Fetch XMLTV data from a given URL, file:// URL or local file path."""
         try:
+            path = _local_feed_path(url)
+            if path is not None:
+                # Lokální soubor číst v executor aby neblokoval
+                content = await asyncio.wait_for(
+                    self.hass.async_add_executor_job(_read_feed_file, path),
+                    timeout=API_TIMEOUT,
+                )
+                return await self._parse_xmltv(content, url)
+
             async with self.session.get(url, timeout=API_TIMEOUT) as response:
                 if response.status == 200:
                     content = await response.text()
-                    
-                    # Check content size
-                    content_size_mb = len(content) / (1024 * 1024)
-                    if content_size_mb > 10:
-                        _LOGGER.warning(
-                            "Large XML file detected: %.2f MB. This may cause performance issues.",
-                            content_size_mb
-                        )
-                    
-                    # Parse XML v executor aby neblokoval
-                    root = await self.hass.async_add_executor_job(
-                        ET.fromstring,
-                        content
-                    )
-                    
-                    _LOGGER.debug("Successfully fetched XMLTV from %s (%.2f MB)", url, content_size_mb)
-                    return root
+                    return await self._parse_xmltv(content, url)
                     
                 _LOGGER.warning("Failed to fetch XMLTV: HTTP %s (%s)", response.status, url)
                 return None
@@ -149,6 +217,25 @@ class SkTVProgramAPI:
             _LOGGER.error("Error fetching XMLTV from %s: %s", url, err)
             return None
 
+    async def _parse_xmltv(self, content: Union[str, bytes], url: str) -> Element:
+        """Parse fetched XMLTV content."""
+        # Check content size
+        content_size_mb = len(content) / (1024 * 1024)
+        if content_size_mb > 10:
+            _LOGGER.warning(
+                "Large XML file detected: %.2f MB. This may cause performance issues.",
+                content_size_mb
+            )
+
+        # Parse XML v executor aby neblokoval
+        root = await self.hass.async_add_executor_job(
+            ET.fromstring,
+            content
+        )
+
+        _LOGGER.debug("Successfully fetched XMLTV from %s (%.2f MB)", url, content_size_mb)
+        return root
+
     def _parse_xmltv_datetime(self, dt_string: str) -> Optional[datetime]:
         """Parse XMLTV datetime format (YYYYMMDDHHmmss +ZONE) to timezone-aware datetime."""
         try:
@@ -215,6 +302,10 @@ class SkTVProgramAPI:
 
         channel_ids = [cid.lower() for cid in xmltv_channel_ids.get(channel_id, [channel_id])]
 
+        cache = self._program_cache.get(channel_id, {})
+        self._used_strings = set()
+        new_cache: Dict[Tuple[str, str], Tuple[Tuple, Dict[str, Any]]] = {}
+
         try:
             for programme in xmltv_root.findall("programme"):
                 iteration_count += 1
@@ -246,49 +337,129 @@ class SkTVProgramAPI:
                 if not start_str or not stop_str:
                     continue
 
-                # Parse XMLTV datetime with timezone
-                start = self._parse_xmltv_datetime(start_str)
-                stop = self._parse_xmltv_datetime(stop_str)
-                
-                if not start or not stop:
-                    continue
+                # Nezměněné pořady převzít z cache bez nového zpracování
+                cache_key = (channel_attr, start_str)
+                fingerprint = _programme_fingerprint(programme, stop_str, self._intern)
+                cached = cache.get(cache_key)
+                if cached is not None and cached[0] == fingerprint:
+                    program = cached[1]
+                    self._keep_strings(program)
+                else:
+                    program = self._parse_programme(programme, start_str, stop_str)
+                    if program is None:
+                        continue
+                new_cache[cache_key] = (fingerprint, program)
 
                 # Filter by date range (keep programs from 2 hours ago to 7 days ahead)
+                start = program["start_datetime"]
                 if start < now - timedelta(hours=2) or start > end_date:
                     continue
 
-                # Extract program details
-                title_el = programme.find("title")
-                desc_el = programme.find("desc")
-                category_el = programme.find("category")
-                sub_title_el = programme.find("sub-title")
-                
-                title = title_el.text if title_el is not None and title_el.text else "Bez názvu"
-                description = desc_el.text if desc_el is not None and desc_el.text else ""
-                genre = category_el.text if category_el is not None and category_el.text else ""
-                episode_title = sub_title_el.text if sub_title_el is not None and sub_title_el.text else ""
-
-                duration_minutes = int((stop - start).total_seconds() / 60)
-
-                programs.append({
-                    "title": title,
-                    "supertitle": "",
-                    "episode_title": episode_title,
-                    "description": description,
-                    "genre": genre,
-                    "duration": f"{duration_minutes} min",
-                    "date": start.strftime("%Y-%m-%d"),
-                    "time": start.strftime("%H:%M"),
-                    "stop_time": stop.strftime("%H:%M"),
-                    "start_datetime": start,
-                    "stop_datetime": stop,
-                    "episode": "",
-                    "link": "",
-                    "live": False,
-                    "premiere": False,
-                })
+                programs.append(program)
                 
         except Exception as err:
             _LOGGER.error("Error filtering programs for channel %s: %s", channel_id, err, exc_info=True)
 
+        # Pořady, které z feedu zmizely, z cache vypadnou a jejich řetězce z poolu
+        self._program_cache[channel_id] = new_cache
+        self._string_pool.commit(channel_id, self._used_strings)
+        self._used_strings = set()
         return programs
+
+    def _intern(self, value: str) -> str:
+        """Return the pooled copy of a string and mark it used by this pass."""
+        value = self._string_pool.intern(value)
+        if value:
+            self._used_strings.add(value)
+        return value
+
+    def _keep_strings(self, program: Dict[str, Any]) -> None:
+        """Mark the strings of a reused program as used by this pass."""
+        for value in program.values():
+            if isinstance(value, str) and value:
+                self._used_strings.add(value)
+            elif isinstance(value, list):
+                self._used_strings.update(item for item in value if isinstance(item, str) and item)
+
+    def _parse_programme(self, programme: Element, start_str: str, stop_str: str) -> Optional[Dict[str, Any]]:
+        """Parse a single XMLTV programme element in one pass over its children."""
+        # Parse XMLTV datetime with timezone
+        start = self._parse_xmltv_datetime(start_str)
+        stop = self._parse_xmltv_datetime(stop_str)
+
+        if not start or not stop:
+            return None
+
+        title = ""
+        description = ""
+        episode_title = ""
+        genres: List[str] = []
+        episode_ns = ""
+        episode_onscreen = ""
+        icon = ""
+        rating = ""
+        link = ""
+        premiere = False
+
+        for child in programme:
+            tag = child.tag
+            text = (child.text or "").strip()
+            if tag == "title":
+                title = title or text
+            elif tag == "desc":
+                description = description or text
+            elif tag == "sub-title":
+                episode_title = episode_title or text
+            elif tag == "category":
+                if text and text not in genres:
+                    genres.append(self._intern(text))
+            elif tag == "episode-num":
+                if child.attrib.get("system") == "onscreen":
+                    episode_onscreen = episode_onscreen or text
+                elif child.attrib.get("system") == "xmltv_ns":
+                    episode_ns = episode_ns or text
+            elif tag == "premiere":
+                premiere = True
+            elif tag == "icon":
+                icon = icon or child.attrib.get("src", "")
+            elif tag == "rating":
+                value_el = child.find("value")
+                if value_el is not None and value_el.text:
+                    rating = rating or value_el.text.strip()
+            elif tag == "url":
+                link = link or text
+
+        season, episode_number = _parse_xmltv_ns(episode_ns)
+        if episode_onscreen:
+            episode = episode_onscreen
+        elif season is not None and episode_number is not None:
+            episode = f"S{season:02d}E{episode_number:02d}"
+        elif episode_number is not None:
+            episode = f"E{episode_number:02d}"
+        else:
+            episode = ""
+
+        duration_minutes = int((stop - start).total_seconds() / 60)
+
+        return {
+            "title": self._intern(title) if title else "Bez názvu",
+            "supertitle": "",
+            "episode_title": self._intern(episode_title),
+            "description": self._intern(description),
+            "genre": genres[0] if genres else "",
+            "genres": genres,
+            "duration": self._intern(f"{duration_minutes} min"),
+            "date": self._intern(start.strftime("%Y-%m-%d")),
+            "time": self._intern(start.strftime("%H:%M")),
+            "stop_time": self._intern(stop.strftime("%H:%M")),
+            "start_datetime": start,
+            "stop_datetime": stop,
+            "episode": self._intern(episode),
+            "season": season,
+            "episode_number": episode_number,
+            "icon": self._intern(icon),
+            "rating": self._intern(rating),
+            "link": link,
+            "live": False,
+            "premiere": premiere,
+        }
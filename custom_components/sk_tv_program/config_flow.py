@@ -9,8 +9,21 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
-
-from .const import DOMAIN, AVAILABLE_CHANNELS
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+
+from .const import (
+    DOMAIN,
+    AVAILABLE_CHANNELS,
+    CONF_FEED_URL,
+    CONF_WATCH_CHANNELS,
+    CONF_WATCH_GENRES,
+    CONF_WATCH_LEAD_TIME,
+    CONF_WATCH_TITLES,
+    DEFAULT_WATCH_LEAD_TIME,
+    XMLTV_API_URL,
+)
+from .api import is_valid_feed_url
+from .watch import find_invalid_pattern, split_title_patterns
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +42,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(DOMAIN)
             self._abort_if_unique_id_configured()
 
-            return self.async_create_entry(
-                title="Slovak TV Program",
-                data=user_input,
-            )
+            feed_url = user_input.get(CONF_FEED_URL, XMLTV_API_URL)
+            if not await self.hass.async_add_executor_job(is_valid_feed_url, feed_url):
+                errors[CONF_FEED_URL] = "invalid_feed_url"
+            else:
+                return self.async_create_entry(
+                    title="Slovak TV Program",
+                    data=user_input,
+                )
 
         channel_options = {
             channel_id: channel_name 
@@ -47,6 +64,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         "channels",
                         default=list(AVAILABLE_CHANNELS.keys())
                     ): cv.multi_select(channel_options),
+                    vol.Optional(CONF_FEED_URL, default=XMLTV_API_URL): str,
                 }
             ),
             errors=errors,
@@ -68,13 +86,22 @@ class OptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            feed_url = user_input.get(CONF_FEED_URL, XMLTV_API_URL)
+            if find_invalid_pattern(split_title_patterns(user_input.get(CONF_WATCH_TITLES))):
+                errors[CONF_WATCH_TITLES] = "invalid_regex"
+            elif not await self.hass.async_add_executor_job(is_valid_feed_url, feed_url):
+                errors[CONF_FEED_URL] = "invalid_feed_url"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         channel_options = {
             channel_id: channel_name 
             for channel_id, channel_name in AVAILABLE_CHANNELS.items()
         }
+        options = self.config_entry.options
 
         return self.async_show_form(
             step_id="init",
@@ -82,8 +109,35 @@ class OptionsFlow(config_entries.OptionsFlow):
                 {
                     vol.Required(
                         "channels",
-                        default=self.config_entry.data.get("channels", list(AVAILABLE_CHANNELS.keys())),
+                        default=options.get(
+                            "channels",
+                            self.config_entry.data.get("channels", list(AVAILABLE_CHANNELS.keys())),
+                        ),
                     ): cv.multi_select(channel_options),
+                    vol.Optional(
+                        CONF_WATCH_TITLES,
+                        default=options.get(CONF_WATCH_TITLES, ""),
+                    ): TextSelector(TextSelectorConfig(multiline=True)),
+                    vol.Optional(
+                        CONF_WATCH_GENRES,
+                        default=options.get(CONF_WATCH_GENRES, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_WATCH_CHANNELS,
+                        default=options.get(CONF_WATCH_CHANNELS, []),
+                    ): cv.multi_select(channel_options),
+                    vol.Optional(
+                        CONF_WATCH_LEAD_TIME,
+                        default=options.get(CONF_WATCH_LEAD_TIME, DEFAULT_WATCH_LEAD_TIME),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+                    vol.Optional(
+                        CONF_FEED_URL,
+                        default=options.get(
+                            CONF_FEED_URL,
+                            self.config_entry.data.get(CONF_FEED_URL, XMLTV_API_URL),
+                        ),
+                    ): str,
                 }
             ),
+            errors=errors,
         )
@@ -23,5 +23,23 @@ AVAILABLE_CHANNELS = {
 XMLTV_API_URL = "https://www.open-epg.com/files/slovakia1.xml"
 API_TIMEOUT = 30
 
+# Feed source override - http(s) URL, file:// URL or local file path
+CONF_FEED_URL = "feed_url"
+
 # Default values
 DEFAULT_DAYS_AHEAD = 7
+
+# Watch list (favourite programmes)
+CONF_WATCH_TITLES = "watch_titles"
+CONF_WATCH_GENRES = "watch_genres"
+CONF_WATCH_CHANNELS = "watch_channels"
+CONF_WATCH_LEAD_TIME = "watch_lead_time"
+DEFAULT_WATCH_LEAD_TIME = 5  # minutes
+EVENT_WATCH_START = "sk_tv_program_watch_start"
+WATCH_FIRED_STORAGE_KEY = f"{DOMAIN}.watch_fired"
+WATCH_FIRED_STORAGE_VERSION = 1
+
+# Keys in hass.data[DOMAIN] shared by all config entries
+DATA_WATCH_FIRED = "watch_fired"
+DATA_STRING_POOL = "string_pool"
+DATA_PROGRAM_STORE = "program_store"
@@ -0,0 +1,106 @@
+"""Data update coordinator for Slovak TV Program."""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import SkTVProgramAPI
+from .const import DOMAIN
+from .watch import WatchScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(hours=6)
+# Kratší interval pro opakované ověření, když servírujeme starší data
+REVALIDATE_INTERVAL = timedelta(minutes=15)
+
+
+def _covers_now(programs: Optional[List[Dict[str, Any]]]) -> bool:
+    """Return True if the programs still reach past the current time."""
+    if not programs:
+        return False
+    now = dt_util.now()
+    return any(
+        isinstance(program.get("stop_datetime"), datetime) and program["stop_datetime"] > now
+        for program in programs
+    )
+
+
+class SkTVProgramCoordinator(DataUpdateCoordinator):
+    """Coordinator for one channel with stale-while-revalidate semantics.
+
+    A failed or empty fetch keeps serving the last good programs as long as
+    they still cover the current time, and retries every REVALIDATE_INTERVAL.
+    The update only fails once the cached window has run out.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SkTVProgramAPI,
+        channel_id: str,
+        watch_scheduler: WatchScheduler,
+    ):
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{channel_id}",
+            update_interval=SCAN_INTERVAL,
+        )
+        self.api = api
+        self.channel_id = channel_id
+        self._watch_scheduler = watch_scheduler
+        self.last_fetch: Optional[datetime] = None
+        self.stale = False
+        # True while a refresh of this channel is running or queued
+        self.refreshing = False
+
+    @callback
+    def async_seed(self, programs: Optional[List[Dict[str, Any]]], fetched_at: Optional[datetime]) -> bool:
+        """Serve persisted programs until the first fetch, return True if usable."""
+        if not _covers_now(programs):
+            return False
+
+        self.last_fetch = fetched_at
+        self.stale = True
+        self._watch_scheduler.async_process(self.channel_id, programs)
+        self.async_set_updated_data(programs)
+        return True
+
+    async def _async_update_data(self) -> List[Dict[str, Any]]:
+        """Fetch data, falling back to the last good programs."""
+        self.refreshing = True
+        try:
+            data = await self.api.async_update_channel_data(self.channel_id)
+            error: Optional[Exception] = None
+        except Exception as err:
+            data = []
+            error = err
+        finally:
+            self.refreshing = False
+
+        if data:
+            self.last_fetch = dt_util.utcnow()
+            self.stale = False
+            self.update_interval = SCAN_INTERVAL
+            self._watch_scheduler.async_process(self.channel_id, data)
+            return data
+
+        if _covers_now(self.data):
+            if not self.stale:
+                _LOGGER.warning(
+                    "No fresh data for channel %s, serving cached programs from %s",
+                    self.channel_id, self.last_fetch,
+                )
+            self.stale = True
+            self.update_interval = REVALIDATE_INTERVAL
+            return self.data
+
+        self.update_interval = REVALIDATE_INTERVAL
+        if error is not None:
+            raise UpdateFailed(f"Error fetching data for {self.channel_id}: {error}") from error
+        raise UpdateFailed(f"No data received from API for channel {self.channel_id}")
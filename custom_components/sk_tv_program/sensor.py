@@ -1,19 +1,19 @@
 """Sensor platform for Slovak TV Program."""
 import logging
-import json
-import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from functools import lru_cache
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN, AVAILABLE_CHANNELS
+from .storage import ProgramStore, get_program_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,6 +21,27 @@ _LOGGER = logging.getLogger(__name__)
 MAX_UPCOMING_PROGRAMS = 10
 MAX_ALL_PROGRAMS = 50  # Limit pro all_programs místo tisíců
 
+# Okno pro sloučení aktualizací kanálů z jednoho cyklu (sekundy)
+BATCH_WINDOW = 30
+
+
+def _program_signature(program: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the program fields exposed in the sensor attributes."""
+    return (
+        program.get('start_datetime'),
+        program.get('stop_datetime'),
+        program.get('title'),
+        program.get('episode_title'),
+        program.get('description'),
+        program.get('genre'),
+        program.get('episode'),
+        program.get('rating'),
+        program.get('icon'),
+        program.get('link'),
+        program.get('live'),
+        program.get('premiere'),
+    )
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -29,19 +50,108 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform."""
     coordinators = hass.data[DOMAIN][config_entry.entry_id]
+    batcher = SensorUpdateBatcher(hass, get_program_store(hass))
+    config_entry.async_on_unload(batcher.async_shutdown)
 
     entities = []
     for channel_id, channel_data in coordinators.items():
         coordinator = channel_data["coordinator"]
-        entities.append(SkTVProgramSensor(hass, coordinator, channel_id))
+        entities.append(SkTVProgramSensor(hass, coordinator, channel_id, batcher))
 
     async_add_entities(entities)
 
 
+class SensorUpdateBatcher:
+    """Coalesce coordinator updates of all channel sensors.
+
+    Updates are collected until no other channel is still refreshing or
+    BATCH_WINDOW expires. The flush performs one snapshot write for all
+    channels and only writes the states whose displayed programmes changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, store: ProgramStore):
+        """Initialize the batcher."""
+        self._hass = hass
+        self._store = store
+        self._sensors: Set["SkTVProgramSensor"] = set()
+        self._pending: Set["SkTVProgramSensor"] = set()
+        self._snapshot: Dict[str, List[Dict[str, Any]]] = {}
+        self._fetched_at: Dict[str, Optional[datetime]] = {}
+        self._unsub_flush: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_register(self, sensor: "SkTVProgramSensor") -> None:
+        """Register a sensor taking part in the batches."""
+        self._sensors.add(sensor)
+
+    @callback
+    def async_unregister(self, sensor: "SkTVProgramSensor") -> None:
+        """Unregister a sensor, its pending data is still saved."""
+        self._sensors.discard(sensor)
+
+    @callback
+    def async_schedule(self, sensor: "SkTVProgramSensor") -> None:
+        """Queue a sensor update for the next flush."""
+        self._pending.add(sensor)
+
+        if any(other.coordinator.refreshing for other in self._sensors - self._pending):
+            # Další kanály z tohoto cyklu ještě běží
+            if self._unsub_flush is None:
+                self._unsub_flush = async_call_later(self._hass, BATCH_WINDOW, self._async_flush)
+        else:
+            self._async_cancel_timer()
+            self._unsub_flush = async_call_later(self._hass, 0, self._async_flush)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Save pending updates without writing states."""
+        self._async_cancel_timer()
+        pending, self._pending = self._pending, set()
+        self._async_save_snapshot(pending)
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        """Cancel the scheduled flush."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _async_flush(self, _now: Any = None) -> None:
+        """Persist all pending channels at once and write changed states."""
+        self._unsub_flush = None
+        pending, self._pending = self._pending, set()
+
+        self._async_save_snapshot(pending)
+
+        written = 0
+        for sensor in pending:
+            if sensor in self._sensors and sensor.async_refresh_state_signature():
+                sensor.async_write_ha_state()
+                written += 1
+
+        _LOGGER.debug("Flushed %d channel updates, %d state writes", len(pending), written)
+
+    @callback
+    def _async_save_snapshot(self, pending: Set["SkTVProgramSensor"]) -> None:
+        """Queue one snapshot write for the channels whose data changed."""
+        changed_data = False
+        for sensor in pending:
+            channel_data = sensor.channel_data
+            if channel_data and self._snapshot.get(sensor.channel_id) is not channel_data:
+                self._snapshot[sensor.channel_id] = channel_data
+                self._fetched_at[sensor.channel_id] = sensor.coordinator.last_fetch
+                changed_data = True
+
+        # Jeden zápis snapshotu za celý cyklus
+        if changed_data:
+            self._store.async_schedule_save(dict(self._snapshot), dict(self._fetched_at))
+
+
 class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Slovak TV Program sensor."""
 
-    def __init__(self, hass: HomeAssistant, coordinator, channel_id: str):
+    def __init__(self, hass: HomeAssistant, coordinator, channel_id: str, batcher: SensorUpdateBatcher):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._hass = hass
@@ -55,48 +165,32 @@ class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
         self._cached_data: Optional[Tuple[Optional[Dict], List[Dict]]] = None
         self._last_update: Optional[datetime] = None
 
-        # JSON storage path
-        storage_dir = os.path.join(hass.config.path(), ".storage", DOMAIN)
-        os.makedirs(storage_dir, exist_ok=True)
-        self._json_file = os.path.join(storage_dir, f"{channel_id}.json")
-
-        # Load cached data from JSON on init
-        self._load_from_json()
-
-    def _load_from_json(self) -> None:
-        """Load cached data from JSON file."""
-        if os.path.exists(self._json_file):
-            try:
-                with open(self._json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert datetime strings back to datetime objects
-                    for program in data:
-                        if 'start_datetime' in program and isinstance(program['start_datetime'], str):
-                            program['start_datetime'] = datetime.fromisoformat(program['start_datetime'])
-                        if 'stop_datetime' in program and isinstance(program['stop_datetime'], str):
-                            program['stop_datetime'] = datetime.fromisoformat(program['stop_datetime'])
-                    _LOGGER.debug("Loaded %d programs from JSON for %s", len(data), self._channel_id)
-            except Exception as err:
-                _LOGGER.error("Error loading JSON for %s: %s", self._channel_id, err)
-
-    def _save_to_json(self, data: List[Dict[str, Any]]) -> None:
-        """Save data to JSON file."""
-        try:
-            # Convert datetime objects to strings for JSON serialization
-            json_data = []
-            for program in data:
-                program_copy = program.copy()
-                if 'start_datetime' in program_copy and isinstance(program_copy['start_datetime'], datetime):
-                    program_copy['start_datetime'] = program_copy['start_datetime'].isoformat()
-                if 'stop_datetime' in program_copy and isinstance(program_copy['stop_datetime'], datetime):
-                    program_copy['stop_datetime'] = program_copy['stop_datetime'].isoformat()
-                json_data.append(program_copy)
-
-            with open(self._json_file, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
-            _LOGGER.debug("Saved %d programs to JSON for %s", len(json_data), self._channel_id)
-        except Exception as err:
-            _LOGGER.error("Error saving JSON for %s: %s", self._channel_id, err)
+        # Coalescing of state writes and persistence across channels
+        self._batcher = batcher
+        self._state_signature: Optional[Tuple[Any, ...]] = None
+
+    async def async_added_to_hass(self) -> None:
+        """Register with the batcher when added to hass."""
+        await super().async_added_to_hass()
+        self._batcher.async_register(self)
+        self.async_refresh_state_signature()
+        # Zařadit počáteční data do prvního snapshotu
+        self._batcher.async_schedule(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Unregister from the batcher when removed."""
+        self._batcher.async_unregister(self)
+        await super().async_will_remove_from_hass()
+
+    @property
+    def channel_id(self) -> str:
+        """Return the channel id."""
+        return self._channel_id
+
+    @property
+    def channel_data(self) -> List[Dict[str, Any]]:
+        """Return the current channel data."""
+        return self._channel_data
 
     @property
     def _channel_data(self) -> List[Dict[str, Any]]:
@@ -106,13 +200,32 @@ class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
         # Data are now a list directly, not a dict
         return self.coordinator.data if isinstance(self.coordinator.data, list) else []
 
+    @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        # Save to JSON when coordinator updates
+        # State write and persistence are coalesced by the batcher
+        self._batcher.async_schedule(self)
+
+    @callback
+    def async_refresh_state_signature(self) -> bool:
+        """Recompute the current/next signature, return True if it changed."""
+        # Nová data - zahodit cache current/next
+        self._cached_data = None
+        current_program, next_programs = self._get_programs()
         channel_data = self._channel_data
-        if channel_data:
-            self._save_to_json(channel_data)
-        super()._handle_coordinator_update()
+        # Vše, co se promítá do stavu a atributů (current, upcoming, all_programs)
+        signature = (
+            self.available,
+            self.coordinator.stale,
+            len(channel_data),
+            _program_signature(current_program) if current_program else None,
+            tuple(_program_signature(p) for p in next_programs),
+            tuple(_program_signature(p) for p in channel_data[:MAX_ALL_PROGRAMS]),
+        )
+        if signature == self._state_signature:
+            return False
+        self._state_signature = signature
+        return True
 
     def _get_programs(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
         """Get current and next programs with caching."""
@@ -196,7 +309,13 @@ class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
                 "channel": self._channel_name,
                 "channel_id": self._channel_id,
                 "total_programs": len(channel_data),
+                "stale": self.coordinator.stale,
             }
+
+            # Čas stažení servírovaných dat (stale-while-revalidate), stáří
+            # si šablony dopočítají - atributy se zapisují jen při změně
+            if self.coordinator.last_fetch is not None:
+                attributes["last_fetch"] = self.coordinator.last_fetch.isoformat()
             
             # Current program details
             if current_program:
@@ -207,9 +326,14 @@ class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
                     "current_time": current_program.get('time', ''),
                     "current_date": current_program.get('date', ''),
                     "current_genre": current_program.get('genre', ''),
+                    "current_genres": current_program.get('genres', []),
                     "current_duration": current_program.get('duration', ''),
                     "current_description": current_program.get('description', ''),
                     "current_episode": current_program.get('episode', ''),
+                    "current_season": current_program.get('season'),
+                    "current_episode_number": current_program.get('episode_number'),
+                    "current_icon": current_program.get('icon', ''),
+                    "current_rating": current_program.get('rating', ''),
                     "current_link": current_program.get('link', ''),
                     "current_live": current_program.get('live', False),
                     "current_premiere": current_program.get('premiere', False),
@@ -224,6 +348,7 @@ class SkTVProgramSensor(CoordinatorEntity, SensorEntity):
                     "genre": p.get('genre', ''),
                     "duration": p.get('duration', ''),
                     "description": p.get('description', ''),
+                    "episode": p.get('episode', ''),
                     "live": p.get('live', False),
                     "premiere": p.get('premiere', False),
                 }
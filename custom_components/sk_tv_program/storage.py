@@ -0,0 +1,228 @@
+"""Persistent program snapshot for Slovak TV Program."""
+import json
+import logging
+import os
+import asyncio
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_PROGRAM_STORE, DOMAIN
+from .string_pool import StringPool, get_string_pool
+
+_LOGGER = logging.getLogger(__name__)
+
+# Verze formátu JSON snapshotu se sdílenou tabulkou řetězců
+# 1 = seznam programů v <kanál>.json, 2 = <kanál>.json s tabulkou řetězců,
+# 3 = všechny kanály v programs.json
+SNAPSHOT_VERSION = 3
+LEGACY_SNAPSHOT_VERSION = 2
+
+DATETIME_FIELDS = ("start_datetime", "stop_datetime")
+
+
+def _pack_channels(
+    channels: Dict[str, List[Dict[str, Any]]], fetched_at: Dict[str, Optional[datetime]]
+) -> Dict[str, Any]:
+    """Pack all channels into a snapshot where every distinct string is stored once.
+
+    String values are replaced by an index into the ``strings`` table shared by
+    all channels, other values are kept as they are. ``fetched_at`` records when
+    each channel's programs were downloaded.
+    """
+    strings: List[str] = []
+    index: Dict[str, int] = {}
+    packed_channels: Dict[str, List[Dict[str, Any]]] = {}
+
+    for channel_id, programs in channels.items():
+        packed = []
+        for program in programs:
+            refs: Dict[str, int] = {}
+            values: Dict[str, Any] = {}
+            for key, value in program.items():
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                if isinstance(value, str):
+                    idx = index.get(value)
+                    if idx is None:
+                        idx = index[value] = len(strings)
+                        strings.append(value)
+                    refs[key] = idx
+                else:
+                    values[key] = value
+            packed.append({"s": refs, "v": values})
+        packed_channels[channel_id] = packed
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "fetched_at": {
+            channel_id: value.isoformat() if value else None
+            for channel_id, value in fetched_at.items()
+            if channel_id in channels
+        },
+        "strings": strings,
+        "channels": packed_channels,
+    }
+
+
+def _unpack_programs(strings: List[str], packed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Unpack the programs of one channel against the string table."""
+    programs = []
+    for item in packed:
+        program = {key: strings[idx] for key, idx in item.get("s", {}).items()}
+        program.update(item.get("v", {}))
+        _restore_datetimes(program)
+        programs.append(program)
+    return programs
+
+
+def _restore_datetimes(program: Dict[str, Any]) -> None:
+    """Convert datetime strings back to datetime objects."""
+    for key in DATETIME_FIELDS:
+        if isinstance(program.get(key), str):
+            program[key] = datetime.fromisoformat(program[key])
+
+
+def _unpack_legacy_channel(data: Any, pool: StringPool) -> List[Dict[str, Any]]:
+    """Unpack a per-channel snapshot (plain list or string table version 2)."""
+    if isinstance(data, list):
+        for program in data:
+            _restore_datetimes(program)
+        return data
+    if isinstance(data, dict) and data.get("version") == LEGACY_SNAPSHOT_VERSION:
+        strings = [pool.intern(value) for value in data.get("strings", [])]
+        return _unpack_programs(strings, data.get("programs", []))
+    return []
+
+
+def _unpack_channels(
+    data: Dict[str, Any], pool: StringPool
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Optional[datetime]]]:
+    """Unpack a snapshot written by _pack_channels."""
+    if data.get("version") != SNAPSHOT_VERSION:
+        return {}, {}
+
+    strings = [pool.intern(value) for value in data.get("strings", [])]
+    channels = {
+        channel_id: _unpack_programs(strings, packed)
+        for channel_id, packed in data.get("channels", {}).items()
+    }
+
+    fetched_at = {
+        channel_id: dt_util.parse_datetime(value) if value else None
+        for channel_id, value in data.get("fetched_at", {}).items()
+    }
+    return channels, fetched_at
+
+
+class ProgramStore:
+    """Single JSON snapshot holding the programs of all channels."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the store."""
+        self._hass = hass
+        self._dir = hass.config.path(".storage", DOMAIN)
+        self._path = os.path.join(self._dir, "programs.json")
+        self._string_pool = get_string_pool(hass)
+        # Nejnovější snapshot čekající na zápis a jediný běžící zápis
+        self._pending_save: Optional[
+            Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Optional[datetime]]]
+        ] = None
+        self._save_task: Optional[asyncio.Task] = None
+
+    async def async_load(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Optional[datetime]]]:
+        """Load the snapshot programs and fetch times, empty if there is none."""
+        return await self._hass.async_add_executor_job(self._load)
+
+    async def async_save(
+        self, channels: Dict[str, List[Dict[str, Any]]], fetched_at: Dict[str, Optional[datetime]]
+    ) -> None:
+        """Save the snapshot in one write."""
+        await self._hass.async_add_executor_job(self._save, channels, fetched_at)
+
+    @callback
+    def async_schedule_save(
+        self, channels: Dict[str, List[Dict[str, Any]]], fetched_at: Dict[str, Optional[datetime]]
+    ) -> None:
+        """Queue a snapshot; saves run one at a time and only the newest is written."""
+        self._pending_save = (channels, fetched_at)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = self._hass.async_create_task(self._async_save_pending())
+
+    async def _async_save_pending(self) -> None:
+        """Write queued snapshots in order until none is left."""
+        while self._pending_save is not None:
+            channels, fetched_at = self._pending_save
+            self._pending_save = None
+            await self.async_save(channels, fetched_at)
+
+    def _load(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Optional[datetime]]]:
+        """Load the snapshot from disk."""
+        if not os.path.exists(self._path):
+            return self._load_legacy(), {}
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                channels, fetched_at = _unpack_channels(json.load(f), self._string_pool)
+            _LOGGER.debug("Loaded snapshot with %d channels", len(channels))
+            return channels, fetched_at
+        except Exception as err:
+            _LOGGER.error("Error loading program snapshot: %s", err)
+            return {}, {}
+
+    def _load_legacy(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Migrate per-channel snapshots from older versions and remove them."""
+        channels: Dict[str, List[Dict[str, Any]]] = {}
+        if not os.path.isdir(self._dir):
+            return channels
+
+        for name in os.listdir(self._dir):
+            channel_id, ext = os.path.splitext(name)
+            if ext != ".json" or name == os.path.basename(self._path):
+                continue
+            path = os.path.join(self._dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    programs = _unpack_legacy_channel(json.load(f), self._string_pool)
+                if programs:
+                    channels[channel_id] = programs
+            except Exception as err:
+                _LOGGER.warning("Error migrating program snapshot %s: %s", name, err)
+            try:
+                os.remove(path)
+            except OSError as err:
+                _LOGGER.warning("Error removing old program snapshot %s: %s", name, err)
+
+        if channels:
+            _LOGGER.debug("Migrated %d per-channel snapshots", len(channels))
+        return channels
+
+    def _save(
+        self, channels: Dict[str, List[Dict[str, Any]]], fetched_at: Dict[str, Optional[datetime]]
+    ) -> None:
+        """Write the snapshot to disk atomically."""
+        try:
+            packed = _pack_channels(channels, fetched_at)
+            os.makedirs(self._dir, exist_ok=True)
+            # Jedinečný dočasný soubor, souběžné zápisy si ho nepřepíšou
+            fd, tmp_path = tempfile.mkstemp(dir=self._dir, prefix="programs.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(packed, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, self._path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            _LOGGER.debug("Saved snapshot with %d channels", len(channels))
+        except Exception as err:
+            _LOGGER.error("Error saving program snapshot: %s", err)
+
+
+def get_program_store(hass: HomeAssistant) -> ProgramStore:
+    """Return the program store shared by the integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PROGRAM_STORE not in domain_data:
+        domain_data[DATA_PROGRAM_STORE] = ProgramStore(hass)
+    return domain_data[DATA_PROGRAM_STORE]
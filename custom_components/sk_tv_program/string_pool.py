@@ -0,0 +1,50 @@
+"""Shared string pool for Slovak TV Program."""
+import threading
+from typing import Dict, Set
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_STRING_POOL, DOMAIN
+
+
+class StringPool:
+    """Deduplicate repeated strings across channels.
+
+    Unlike ``sys.intern`` (immortal on Python 3.12) the pool is owned by the
+    integration: every ingest records the strings its channel still uses and
+    strings no channel uses any more are released.
+    """
+
+    def __init__(self):
+        """Initialize the pool."""
+        self._lock = threading.Lock()
+        self._strings: Dict[str, str] = {}
+        self._owners: Dict[str, Set[str]] = {}
+
+    def intern(self, value: str) -> str:
+        """Return the shared copy of a string."""
+        if not value:
+            return value
+        with self._lock:
+            return self._strings.setdefault(value, value)
+
+    def commit(self, owner: str, used: Set[str]) -> None:
+        """Record the strings an owner uses now and release unused ones."""
+        with self._lock:
+            self._owners[owner] = used
+            live: Set[str] = set()
+            for strings in self._owners.values():
+                live.update(strings)
+            self._strings = {value: value for value in live}
+
+    def __len__(self) -> int:
+        """Return the number of pooled strings."""
+        return len(self._strings)
+
+
+def get_string_pool(hass: HomeAssistant) -> StringPool:
+    """Return the string pool shared by all channels."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STRING_POOL not in domain_data:
+        domain_data[DATA_STRING_POOL] = StringPool()
+    return domain_data[DATA_STRING_POOL]
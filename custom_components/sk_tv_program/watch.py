@@ -0,0 +1,226 @@
+"""Favourite-programme watch list for Slovak TV Program."""
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AVAILABLE_CHANNELS,
+    CONF_WATCH_CHANNELS,
+    CONF_WATCH_GENRES,
+    CONF_WATCH_LEAD_TIME,
+    CONF_WATCH_TITLES,
+    DATA_WATCH_FIRED,
+    DEFAULT_WATCH_LEAD_TIME,
+    DOMAIN,
+    EVENT_WATCH_START,
+    WATCH_FIRED_STORAGE_KEY,
+    WATCH_FIRED_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def split_title_patterns(value: Any) -> List[str]:
+    """Split the configured title patterns (one regex per line)."""
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if not value:
+        return []
+    return [line.strip() for line in str(value).splitlines() if line.strip()]
+
+
+def split_genres(value: Any) -> List[str]:
+    """Split the configured genres (comma separated)."""
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if not value:
+        return []
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def find_invalid_pattern(patterns: List[str]) -> Optional[str]:
+    """Return the first pattern that is not a valid regex, if any."""
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error:
+            return pattern
+    return None
+
+
+class WatchList:
+    """Title regexes, genres and channels compiled once into a matcher."""
+
+    def __init__(self, titles: List[str], genres: List[str], channels: List[str]):
+        """Initialize the watch list."""
+        # Každý vzor zvlášť - spojení do jednoho regexu rozbije globální
+        # příznaky, pojmenované skupiny i zpětné reference
+        self._title_res: List[Pattern[str]] = []
+        for pattern in titles:
+            try:
+                self._title_res.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as err:
+                _LOGGER.warning("Ignoring invalid watch title pattern %r: %s", pattern, err)
+        self._genres = frozenset(genre.casefold() for genre in genres)
+        self._channels = frozenset(channels)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "WatchList":
+        """Build the watch list from config entry options."""
+        return cls(
+            split_title_patterns(config.get(CONF_WATCH_TITLES)),
+            split_genres(config.get(CONF_WATCH_GENRES)),
+            list(config.get(CONF_WATCH_CHANNELS) or []),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True if nothing can ever match."""
+        return not self._title_res and not self._genres
+
+    def matches(self, channel_id: str, program: Dict[str, Any]) -> bool:
+        """Return True if the programme is on the watch list."""
+        if self._channels and channel_id not in self._channels:
+            return False
+        title = program.get("title", "")
+        if any(title_re.search(title) for title_re in self._title_res):
+            return True
+        if self._genres:
+            genres = program.get("genres") or [program.get("genre") or ""]
+            if any(genre.casefold() in self._genres for genre in genres):
+                return True
+        return False
+
+
+class WatchScheduler:
+    """Schedule watch start events for newly ingested matching programmes.
+
+    Only programmes that are new or changed since the previous refresh of a
+    channel are matched, so the cost scales with new data.
+    """
+
+    def __init__(self, hass: HomeAssistant, watch_list: WatchList, lead_time: timedelta):
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._watch_list = watch_list
+        self._lead_time = lead_time
+        # channel_id -> {start_datetime: (title, genres)}
+        self._seen: Dict[str, Dict[datetime, Tuple[str, Tuple[str, ...]]]] = {}
+        self._scheduled: Dict[Tuple[str, datetime], CALLBACK_TYPE] = {}
+        # "channel_id|start" -> start of programmes whose event already fired,
+        # shared across reloads and persisted across restarts
+        self._fired: Dict[str, str] = {}
+        self._fired_store: Optional[Store] = None
+
+    @classmethod
+    def from_config(cls, hass: HomeAssistant, config: Mapping[str, Any]) -> "WatchScheduler":
+        """Build the scheduler from config entry options."""
+        lead_minutes = config.get(CONF_WATCH_LEAD_TIME, DEFAULT_WATCH_LEAD_TIME)
+        return cls(hass, WatchList.from_config(config), timedelta(minutes=lead_minutes))
+
+    async def async_load(self) -> None:
+        """Load the keys of already fired events."""
+        domain_data = self._hass.data.setdefault(DOMAIN, {})
+        if DATA_WATCH_FIRED not in domain_data:
+            store = Store(self._hass, WATCH_FIRED_STORAGE_VERSION, WATCH_FIRED_STORAGE_KEY)
+            domain_data[DATA_WATCH_FIRED] = (store, await store.async_load() or {})
+        self._fired_store, self._fired = domain_data[DATA_WATCH_FIRED]
+
+    @callback
+    def async_process(self, channel_id: str, programs: List[Dict[str, Any]]) -> None:
+        """Match new or changed programmes of a channel and schedule events."""
+        if self._watch_list.is_empty:
+            return
+
+        seen = self._seen.get(channel_id, {})
+        current: Dict[datetime, Tuple[str, Tuple[str, ...]]] = {}
+
+        for program in programs:
+            start = program.get("start_datetime")
+            if not isinstance(start, datetime):
+                continue
+
+            fingerprint = (program.get("title", ""), tuple(program.get("genres") or [program.get("genre", "")]))
+            current[start] = fingerprint
+            if seen.get(start) == fingerprint:
+                continue
+
+            key = (channel_id, start)
+            self._async_cancel(key)
+            if self._watch_list.matches(channel_id, program):
+                self._async_schedule(key, program)
+
+        # Programmes dropped from the feed no longer trigger
+        for start in seen.keys() - current.keys():
+            self._async_cancel((channel_id, start))
+
+        self._seen[channel_id] = current
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Cancel all scheduled events."""
+        for unsub in self._scheduled.values():
+            unsub()
+        self._scheduled.clear()
+        self._seen.clear()
+
+    @callback
+    def _async_cancel(self, key: Tuple[str, datetime]) -> None:
+        """Cancel a scheduled event if there is one."""
+        unsub = self._scheduled.pop(key, None)
+        if unsub is not None:
+            unsub()
+
+    @callback
+    def _async_schedule(self, key: Tuple[str, datetime], program: Dict[str, Any]) -> None:
+        """Schedule the watch start event for a programme."""
+        channel_id, start = key
+        fired_key = f"{channel_id}|{start.isoformat()}"
+        now = dt_util.now()
+        if start <= now or fired_key in self._fired:
+            return
+
+        event_data = {
+            "channel_id": channel_id,
+            "channel": AVAILABLE_CHANNELS.get(channel_id, channel_id),
+            "title": program.get("title", ""),
+            "episode_title": program.get("episode_title", ""),
+            "episode": program.get("episode", ""),
+            "genre": program.get("genre", ""),
+            "start": start.isoformat(),
+            "stop": program["stop_datetime"].isoformat() if program.get("stop_datetime") else None,
+            "lead_time": int(self._lead_time.total_seconds() // 60),
+        }
+
+        @callback
+        def _fire(_now: datetime) -> None:
+            self._scheduled.pop(key, None)
+            self._async_mark_fired(fired_key, start)
+            self._hass.bus.async_fire(EVENT_WATCH_START, event_data)
+
+        fire_at = start - self._lead_time
+        if fire_at <= now:
+            # Ingested inside the lead window, the programme has not started yet
+            _fire(now)
+            return
+
+        self._scheduled[key] = async_track_point_in_time(self._hass, _fire, fire_at)
+        _LOGGER.debug("Scheduled %s for %s at %s", EVENT_WATCH_START, event_data["title"], start)
+
+    @callback
+    def _async_mark_fired(self, fired_key: str, start: datetime) -> None:
+        """Remember a fired event and forget programmes that have started."""
+        now = dt_util.now()
+        for old_key, old_start in list(self._fired.items()):
+            parsed = dt_util.parse_datetime(old_start)
+            if parsed is None or parsed <= now:
+                del self._fired[old_key]
+        self._fired[fired_key] = start.isoformat()
+        if self._fired_store is not None:
+            self._fired_store.async_delay_save(lambda: dict(self._fired), 1)
@@ -0,0 +1,192 @@
+"""Local stand-in for the open-epg.com XMLTV feed, for offline load testing.
+
+Serves a recorded XMLTV file or a synthetic feed on every path, with
+configurable latency, size and failure injection. Point the integration at
+it through the "feed_url" option, e.g. http://127.0.0.1:8099/files/slovakia1.xml
+
+    python tools/epg_standin.py --synthetic --days 7 --programmes-per-day 60
+    python tools/epg_standin.py --feed recorded.xml --latency 5 --fail-rate 0.2
+    python tools/epg_standin.py --synthetic --hang-rate 0.5   # exceeds API_TIMEOUT
+    python tools/epg_standin.py --synthetic --dump /config/epg.xml   # for file:// use
+
+Requires only aiohttp.
+"""
+import argparse
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("epg_standin")
+
+# One XMLTV channel id per integration channel, matching the aliases in api.py
+SYNTHETIC_CHANNELS = [
+    "Jednotka.sk",
+    "Dvojka.sk",
+    "24.rtvs.sk",
+    "sport.rtvs.sk",
+    "Markiza.sk",
+    "Doma.sk",
+    "Dajto.sk",
+    "JOJ.sk",
+    "JOJPlus.sk",
+    "WAU.sk",
+    "Prima.sk",
+    "TA3.sk",
+]
+
+GENRES = ["Seriál", "Film", "Správy", "Šport", "Dokument", "Zábava"]
+
+# Slovník pro generované popisy - každý pořad dostane vlastní text,
+# jako v reálném feedu, kde se opakují hlavně tituly a žánry
+WORDS = (
+    "príbeh rodina mesto noc leto vojna láska tajomstvo polícia detektív "
+    "nemocnica lekár súd advokát farma dedina hory more cesta priateľ "
+    "minulosť budúcnosť pravda zločin svedok obeť hrdina dcéra syn otec "
+    "matka brat sestra učiteľ škola firma peniaze dom záhrada zvieratá "
+    "príroda história kráľ hrad zámok vedec objav expedícia súťaž finále "
+    "zápas tím tréner sezóna rekord hosť moderátor diváci hudba koncert"
+).split()
+
+
+def _synthetic_description(length: int) -> str:
+    """Return a random description of roughly the given length."""
+    words = []
+    size = 0
+    while size < length:
+        word = random.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize()[:length].rstrip() + "."
+
+
+def build_synthetic_feed(
+    days: int, programmes_per_day: int, titles: int, desc_length: int, rerun_rate: float
+) -> str:
+    """Build a synthetic XMLTV document starting two hours in the past.
+
+    Descriptions are unique per programme; ``rerun_rate`` of the programmes
+    repeat an earlier programme of any channel (reprízy, simulcasty).
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = now - timedelta(hours=2)
+    slot = timedelta(days=1) / programmes_per_day
+    title_pool = [f"Relácia {i}" for i in range(titles)]
+    aired = []
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="epg_standin">\n']
+    for channel in SYNTHETIC_CHANNELS:
+        parts.append(f'  <channel id="{channel}"><display-name>{channel}</display-name></channel>\n')
+
+    for channel in SYNTHETIC_CHANNELS:
+        begin = start
+        for index in range(days * programmes_per_day):
+            end = begin + slot
+            if aired and random.random() < rerun_rate:
+                content = random.choice(aired)
+            else:
+                title = random.choice(title_pool)
+                content = (
+                    f"<title>{escape(title)}</title>"
+                    f"<sub-title>Časť {index % 26 + 1}</sub-title>"
+                    f"<desc>{escape(_synthetic_description(desc_length))}</desc>"
+                    f"<category>{random.choice(GENRES)}</category>"
+                    f'<episode-num system="xmltv_ns">{index // 26}.{index % 26}.</episode-num>'
+                )
+                aired.append(content)
+            parts.append(
+                f'  <programme start="{begin:%Y%m%d%H%M%S} +0000" stop="{end:%Y%m%d%H%M%S} +0000" '
+                f'channel="{channel}">{content}</programme>\n'
+            )
+            begin = end
+
+    parts.append("</tv>\n")
+    return "".join(parts)
+
+
+def create_app(args: argparse.Namespace, body: bytes) -> web.Application:
+    """Create the stand-in application."""
+    stats = {"requests": 0, "failed": 0, "hung": 0, "truncated": 0}
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        stats["requests"] += 1
+        delay = args.latency + random.uniform(0, args.jitter)
+
+        if random.random() < args.hang_rate:
+            stats["hung"] += 1
+            _LOGGER.info("%s %s -> hang %.0fs", request.method, request.path, args.hang_time)
+            await asyncio.sleep(args.hang_time)
+
+        await asyncio.sleep(delay)
+
+        if random.random() < args.fail_rate:
+            stats["failed"] += 1
+            _LOGGER.info("%s %s -> HTTP %d", request.method, request.path, args.fail_status)
+            return web.Response(status=args.fail_status, text="injected failure")
+
+        payload = body
+        if random.random() < args.truncate_rate:
+            stats["truncated"] += 1
+            payload = body[: len(body) // 2]
+
+        _LOGGER.info(
+            "%s %s -> 200 (%d bytes, %.2fs) %s",
+            request.method, request.path, len(payload), delay, stats,
+        )
+        return web.Response(body=payload, content_type="application/xml", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", handle)
+    return app
+
+
+def main() -> None:
+    """Run the stand-in server."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--feed", help="recorded XMLTV file to replay")
+    source.add_argument("--synthetic", action="store_true", help="serve a generated feed")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--days", type=int, default=7, help="synthetic: days of programme")
+    parser.add_argument("--programmes-per-day", type=int, default=40, help="synthetic: programmes per channel and day")
+    parser.add_argument("--titles", type=int, default=60, help="synthetic: distinct titles")
+    parser.add_argument("--desc-length", type=int, default=300, help="synthetic: description length")
+    parser.add_argument("--rerun-rate", type=float, default=0.15, help="synthetic: fraction of reruns")
+    parser.add_argument("--latency", type=float, default=0.0, help="base response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra delay in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that stall")
+    parser.add_argument("--hang-time", type=float, default=60.0, help="stall duration in seconds")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="fraction of responses cut in half")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible runs")
+    parser.add_argument("--dump", help="write the feed to this file and exit instead of serving it")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    random.seed(args.seed)
+
+    if args.feed:
+        with open(args.feed, "rb") as f:
+            body = f.read()
+    else:
+        body = build_synthetic_feed(
+            args.days, args.programmes_per_day, args.titles, args.desc_length, args.rerun_rate
+        ).encode("utf-8")
+
+    if args.dump:
+        with open(args.dump, "wb") as f:
+            f.write(body)
+        _LOGGER.info("Wrote %.2f MB feed to %s", len(body) / (1024 * 1024), args.dump)
+        return
+
+    _LOGGER.info("Serving %.2f MB feed on http://%s:%d/", len(body) / (1024 * 1024), args.host, args.port)
+    web.run_app(create_app(args, body), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()